@@ -0,0 +1,275 @@
+# backend/admin.py
+from fastapi import APIRouter, Depends, HTTPException, Query, status, UploadFile, File
+from sqlalchemy.orm import Session
+from sqlalchemy import String, select, insert, update, delete, func, and_, or_, true, type_coerce
+from datetime import datetime
+from typing import List, Literal, Optional
+import base64
+import json
+import uuid
+
+import models, schemas, auth, database, posts, user_import
+
+router = APIRouter(prefix="/admin", tags=["Admin"])
+
+DELETE_BATCH_SIZE = 1000
+SORT_COLUMNS = {
+    "created_at": models.User.created_at,
+    "name": models.User.name,
+    "email": models.User.email,
+}
+
+# --- Keyset Pagination Helpers ---
+# The cursor is the sort value and id of the last row on the previous page,
+# so each page is an index range scan instead of an ever-growing OFFSET.
+
+def get_sort_column(db: Session, sort: str):
+    """
+    The column to order and page by. SQLite keeps datetimes as text in the
+    form they were written ("2024-01-01 10:00:00" from the server default,
+    with microseconds from Python), and compares that text. A re-rendered
+    datetime would not match the stored form, so there the stored text
+    itself is compared and carried in the cursor.
+    """
+    column = SORT_COLUMNS[sort]
+    if sort == "created_at" and db.get_bind().dialect.name == "sqlite":
+        return type_coerce(column, String)
+    return column
+
+def encode_cursor(sort: str, value, user_id: uuid.UUID) -> str:
+    if isinstance(value, datetime):
+        value = value.isoformat()
+    raw = json.dumps([sort, value, str(user_id)])
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+def decode_cursor(cursor: str, sort: str, sort_column):
+    try:
+        cursor_sort, value, user_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        if cursor_sort != sort:
+            raise ValueError("Cursor belongs to a different sort order")
+        if not isinstance(value, str):
+            raise ValueError("Cursor value must be a string")
+        if sort_column is models.User.created_at:
+            value = datetime.fromisoformat(value)
+        return value, uuid.UUID(user_id)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+# --- User Listing ---
+
+@router.get("/users", response_model=schemas.AdminUserPage)
+def list_users(
+    cursor: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=200),
+    sort: Literal["created_at", "name", "email"] = "created_at",
+    order: Literal["asc", "desc"] = "desc",
+    q: Optional[str] = None,
+    role: Optional[str] = None,
+    company: Optional[str] = None,
+    db: Session = Depends(database.get_db),
+    current_admin: models.User = Depends(auth.require_admin)
+):
+    sort_column = get_sort_column(db, sort)
+
+    # Counts are correlated subqueries so they are computed only for the rows
+    # on this page, in the same round trip, without loading posts or messages.
+    post_count = select(func.count(models.Post.id)).where(
+        models.Post.owner_id == models.User.id
+    ).correlate(models.User).scalar_subquery()
+    message_count = select(func.count(models.ChatMessage.id)).where(
+        models.ChatMessage.sender_id == models.User.id
+    ).correlate(models.User).scalar_subquery()
+
+    # Select columns explicitly so the photo blob is never fetched.
+    query = db.query(
+        models.User.id, models.User.name, models.User.email, models.User.phone,
+        models.User.role, models.User.company, models.User.designation,
+        models.User.force_reset, models.User.profile_complete, models.User.created_at,
+        models.User.photo.isnot(None).label("has_photo"),
+        post_count.label("post_count"),
+        message_count.label("message_count"),
+        sort_column.label("sort_value"),
+    )
+
+    if q:
+        query = query.filter(or_(models.User.name.ilike(f"%{q}%"), models.User.email.ilike(f"%{q}%")))
+    if role:
+        query = query.filter(models.User.role == role)
+    if company:
+        query = query.filter(models.User.company == company)
+
+    if cursor:
+        value, last_id = decode_cursor(cursor, sort, sort_column)
+        if order == "asc":
+            query = query.filter(or_(sort_column > value, and_(sort_column == value, models.User.id > last_id)))
+        else:
+            query = query.filter(or_(sort_column < value, and_(sort_column == value, models.User.id < last_id)))
+
+    if order == "asc":
+        query = query.order_by(sort_column.asc(), models.User.id.asc())
+    else:
+        query = query.order_by(sort_column.desc(), models.User.id.desc())
+
+    # Fetch one extra row to learn whether another page exists.
+    rows = query.limit(limit + 1).all()
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_cursor = encode_cursor(sort, last.sort_value, last.id)
+
+    items = [
+        schemas.AdminUserSummary(
+            id=row.id, name=row.name, email=row.email, phone=row.phone, role=row.role,
+            company=row.company, designation=row.designation,
+            force_reset=bool(row.force_reset), profile_complete=bool(row.profile_complete),
+            created_at=row.created_at, has_photo=bool(row.has_photo),
+            post_count=row.post_count, message_count=row.message_count
+        )
+        for row in rows
+    ]
+    return schemas.AdminUserPage(items=items, next_cursor=next_cursor)
+
+@router.get("/db-stats")
+def get_db_stats(current_admin: models.User = Depends(auth.require_admin)):
+    """Health, query and error counts for the primary and each replica, for this worker."""
+    return {"engines": database.get_engine_stats()}
+
+# --- Bulk Operations ---
+
+def target_user_ids(db: Session, user_ids: List[uuid.UUID], current_admin: models.User) -> List[uuid.UUID]:
+    """Narrows the requested ids to existing, non-admin users other than the caller."""
+    rows = db.execute(
+        select(models.User.id).where(
+            models.User.id.in_(user_ids),
+            models.User.role != "admin",
+            models.User.id != current_admin.id,
+        )
+    ).all()
+    return [row.id for row in rows]
+
+def force_reset_users(db: Session, user_ids: List[uuid.UUID]) -> int:
+    result = db.execute(
+        update(models.User).where(models.User.id.in_(user_ids)).values(force_reset=True)
+    )
+    db.commit()
+    return result.rowcount
+
+def delete_in_batches(db: Session, model, condition) -> int:
+    """
+    Deletes rows of `model` matching `condition` in chunks, committing after
+    each one so that no single statement holds locks on a huge row set.
+    """
+    total = 0
+    while True:
+        batch = select(model.id).where(condition).limit(DELETE_BATCH_SIZE)
+        result = db.execute(delete(model).where(model.id.in_(batch)).execution_options(synchronize_session=False))
+        db.commit()
+        total += result.rowcount
+        if result.rowcount < DELETE_BATCH_SIZE:
+            return total
+
+def delete_users(db: Session, user_ids: List[uuid.UUID]) -> int:
+    """
+    Deletes users together with their posts, messages and attachments using
+    set-based statements. Rooms left without any participants are removed
+    along with their remaining content.
+    """
+    if not user_ids:
+        return 0
+
+    participants = models.chat_room_participants
+    room_ids = [
+        row.room_id for row in db.execute(
+            select(participants.c.room_id).where(participants.c.user_id.in_(user_ids)).distinct()
+        ).all()
+    ]
+
+    delete_in_batches(db, models.ChatMessage, models.ChatMessage.sender_id.in_(user_ids))
+    delete_in_batches(db, models.ChatAttachment, models.ChatAttachment.sender_id.in_(user_ids))
+    # Tombstones first, so feed clients learn about the removed posts.
+    posts.lock_post_changes(db)
+    db.execute(insert(models.PostChange).from_select(
+        ["post_id", "owner_id", "deleted"],
+        select(models.Post.id, models.Post.owner_id, true()).where(models.Post.owner_id.in_(user_ids))
+    ))
+    db.commit()
+    delete_in_batches(db, models.Post, models.Post.owner_id.in_(user_ids))
+
+    db.execute(delete(participants).where(participants.c.user_id.in_(user_ids)))
+    db.commit()
+
+    if room_ids:
+        empty_room_ids = [
+            row.id for row in db.execute(
+                select(models.ChatRoom.id).where(
+                    models.ChatRoom.id.in_(room_ids),
+                    ~select(participants.c.room_id).where(participants.c.room_id == models.ChatRoom.id).exists()
+                )
+            ).all()
+        ]
+        if empty_room_ids:
+            delete_in_batches(db, models.ChatMessage, models.ChatMessage.room_id.in_(empty_room_ids))
+            delete_in_batches(db, models.ChatAttachment, models.ChatAttachment.room_id.in_(empty_room_ids))
+            db.execute(delete(models.ChatRoom).where(models.ChatRoom.id.in_(empty_room_ids)))
+            db.commit()
+
+    result = db.execute(delete(models.User).where(models.User.id.in_(user_ids)))
+    db.commit()
+    return result.rowcount
+
+@router.post("/users/bulk/force-reset", response_model=schemas.BulkActionResult)
+def bulk_force_reset(
+    request: schemas.BulkUserIds,
+    db: Session = Depends(database.get_db),
+    current_admin: models.User = Depends(auth.require_admin)
+):
+    user_ids = target_user_ids(db, request.user_ids, current_admin)
+    return schemas.BulkActionResult(affected=force_reset_users(db, user_ids) if user_ids else 0)
+
+@router.post("/users/bulk/delete", response_model=schemas.BulkActionResult)
+def bulk_delete(
+    request: schemas.BulkUserIds,
+    db: Session = Depends(database.get_db),
+    current_admin: models.User = Depends(auth.require_admin)
+):
+    user_ids = target_user_ids(db, request.user_ids, current_admin)
+    return schemas.BulkActionResult(affected=delete_users(db, user_ids))
+
+@router.post("/users/import", response_model=schemas.UserImportReport)
+def import_users(
+    file: UploadFile = File(...),
+    file_format: Optional[Literal["csv", "ndjson"]] = Query(None, alias="format"),
+    db: Session = Depends(database.get_db),
+    current_admin: models.User = Depends(auth.require_admin)
+):
+    """
+    Creates users from a CSV or NDJSON file with name, email, phone and
+    password columns. Invalid or duplicate rows are reported, not fatal.
+    """
+    file_format = file_format or user_import.detect_format(file.filename)
+    return user_import.import_users_from_binary(db, file.file, file_format)
+
+# --- Single User Operations ---
+
+@router.post("/users/{user_id}/force-reset")
+def force_reset_user(
+    user_id: uuid.UUID,
+    db: Session = Depends(database.get_db),
+    current_admin: models.User = Depends(auth.require_admin)
+):
+    if not target_user_ids(db, [user_id], current_admin):
+        raise HTTPException(status_code=404, detail="User not found")
+    force_reset_users(db, [user_id])
+    return {"message": "User marked for password reset"}
+
+@router.delete("/users/{user_id}", status_code=status.HTTP_204_NO_CONTENT)
+def delete_user(
+    user_id: uuid.UUID,
+    db: Session = Depends(database.get_db),
+    current_admin: models.User = Depends(auth.require_admin)
+):
+    if not target_user_ids(db, [user_id], current_admin):
+        raise HTTPException(status_code=404, detail="User not found")
+    delete_users(db, [user_id])
+    return
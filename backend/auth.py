@@ -68,6 +68,36 @@ def get_current_user(
     
     return user
 
+def get_current_user_for_read(
+    token: str = Depends(oauth2_scheme),
+    db: Session = Depends(database.get_read_db)
+) -> models.User:
+    """
+    Same as `get_current_user`, but loads the user through the read session
+    so read-only routes never touch the primary. Shares the route's session
+    when the route also depends on `database.get_read_db`.
+    """
+    credentials_exception = HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Could not validate credentials",
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+    
+    user = get_user_from_token(token, db)
+    if user is None and get_user_id_from_token(token) is not None and db.get_bind() is not database.engine:
+        # A brand-new account may not have reached the replica yet.
+        primary_db = database.SessionLocal()
+        try:
+            user = get_user_from_token(token, primary_db)
+            if user is not None:
+                user = db.merge(user, load=False)
+        finally:
+            primary_db.close()
+    if user is None:
+        raise credentials_exception
+    
+    return user
+
 def require_admin(current_user: models.User = Depends(get_current_user)) -> models.User:
     """
     Dependency to ensure the current user is an admin.
@@ -82,12 +112,12 @@ def require_admin(current_user: models.User = Depends(get_current_user)) -> mode
 
 # --- Helper Function for WebSocket Authentication ---
 
-def get_user_from_token(token: str, db: Session) -> models.User | None:
+def get_user_id_from_token(token: str) -> uuid.UUID | None:
     """
-    Decodes a JWT token and returns the corresponding user from the database.
-    This is a standalone function used by the WebSocket endpoint, as it cannot
-    use the standard FastAPI `Depends` system.
-    Returns the User object on success, or None on failure.
+    Decodes a JWT token and returns the user id it was issued for, without
+    touching the database. Used where we need to identify the caller cheaply,
+    e.g. rate limiting before any other work is done.
+    Returns None if the token is invalid.
     """
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
@@ -95,11 +125,22 @@ def get_user_from_token(token: str, db: Session) -> models.User | None:
         if user_id_str is None:
             return None
         
-        user_id = uuid.UUID(user_id_str) # Convert string back to UUID object
+        return uuid.UUID(user_id_str) # Convert string back to UUID object
         
     except (JWTError, ValueError):
         # Catches decoding errors or if user_id is not a valid UUID
         return None
+
+def get_user_from_token(token: str, db: Session) -> models.User | None:
+    """
+    Decodes a JWT token and returns the corresponding user from the database.
+    This is a standalone function used by the WebSocket endpoint, as it cannot
+    use the standard FastAPI `Depends` system.
+    Returns the User object on success, or None on failure.
+    """
+    user_id = get_user_id_from_token(token)
+    if user_id is None:
+        return None
     
     user = db.query(models.User).filter(models.User.id == user_id).first()
     
@@ -2,49 +2,206 @@
 
 from fastapi import APIRouter, WebSocket, WebSocketDisconnect, Depends, HTTPException, UploadFile, File, Form
 from fastapi.responses import StreamingResponse
+from starlette.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session, selectinload
 from sqlalchemy import and_
 from apscheduler.schedulers.background import BackgroundScheduler
 from io import BytesIO
 from datetime import datetime, timedelta
+import asyncio
+import time
 import uuid
-from typing import Dict, List
+from typing import Dict, List, Set
 
-import models, schemas, auth, database
+import models, schemas, auth, database, ratelimit
 
 router = APIRouter(tags=["Chat"])
 
+# --- Heartbeat & Presence Settings ---
+HEARTBEAT_INTERVAL_SECONDS = 20      # How often the server pings every open socket
+IDLE_TIMEOUT_SECONDS = 60            # Sockets silent for longer than this are evicted
+PRESENCE_FLUSH_INTERVAL_SECONDS = 2  # Presence changes are coalesced and sent once per interval
+SEND_TIMEOUT_SECONDS = 5             # A send or close that takes longer means the peer is dead
+
 # WebSocket connection manager
 class ConnectionManager:
+    """
+    Registry of open sockets. A user may be connected from several tabs or
+    devices at once, so each user id maps to a set of sockets. A user is
+    considered online while at least one of their sockets is registered.
+    """
     def __init__(self):
-        self.active_connections: Dict[uuid.UUID, WebSocket] = {}
+        self.active_connections: Dict[uuid.UUID, Set[WebSocket]] = {}
+        self.last_seen: Dict[WebSocket, float] = {}
+        # user_id -> latest online state, waiting for the next presence flush.
+        self.pending_presence: Dict[uuid.UUID, bool] = {}
+        # user_id -> state last announced to contacts, used to drop no-op flips.
+        self.announced_presence: Dict[uuid.UUID, bool] = {}
 
     async def connect(self, user_id: uuid.UUID, websocket: WebSocket):
         await websocket.accept()
-        self.active_connections[user_id] = websocket
-
-    def disconnect(self, user_id: uuid.UUID):
-        if user_id in self.active_connections:
+        sockets = self.active_connections.setdefault(user_id, set())
+        sockets.add(websocket)
+        self.last_seen[websocket] = time.monotonic()
+        if len(sockets) == 1:
+            self.pending_presence[user_id] = True
+
+    def disconnect(self, user_id: uuid.UUID, websocket: WebSocket):
+        # Safe to call more than once for the same socket (e.g. after eviction).
+        self.last_seen.pop(websocket, None)
+        sockets = self.active_connections.get(user_id)
+        if not sockets or websocket not in sockets:
+            return
+        sockets.discard(websocket)
+        if not sockets:
             del self.active_connections[user_id]
+            self.pending_presence[user_id] = False
+
+    def touch(self, websocket: WebSocket):
+        """Records activity on a socket so the idle sweep leaves it alone."""
+        if websocket in self.last_seen:
+            self.last_seen[websocket] = time.monotonic()
+
+    def is_online(self, user_id: uuid.UUID) -> bool:
+        return user_id in self.active_connections
+
+    def online_users(self, user_ids) -> List[uuid.UUID]:
+        return [user_id for user_id in user_ids if user_id in self.active_connections]
+
+    async def evict(self, user_id: uuid.UUID, websocket: WebSocket, reason: str):
+        self.disconnect(user_id, websocket)
+        try:
+            await asyncio.wait_for(websocket.close(code=1001, reason=reason), SEND_TIMEOUT_SECONDS)
+        except Exception:
+            pass
+
+    async def send_to_socket(self, user_id: uuid.UUID, websocket: WebSocket, message: dict):
+        """
+        Sends with a timeout: a dead peer with a full send buffer would
+        otherwise block on drain forever. Sockets that fail or time out are evicted.
+        """
+        try:
+            await asyncio.wait_for(websocket.send_json(message), SEND_TIMEOUT_SECONDS)
+        except asyncio.TimeoutError:
+            await self.evict(user_id, websocket, "Send timeout")
+        except Exception:
+            self.disconnect(user_id, websocket)
 
     async def send_personal_message(self, message: dict, user_id: uuid.UUID):
-        if user_id in self.active_connections:
-            websocket = self.active_connections[user_id]
-            await websocket.send_json(message)
+        # Copy the set: a failed send removes the socket while we iterate.
+        await asyncio.gather(*(
+            self.send_to_socket(user_id, websocket, message)
+            for websocket in list(self.active_connections.get(user_id, ()))
+        ))
 
     async def broadcast_to_room(self, room_id: uuid.UUID, message: dict, db: Session):
         room = db.query(models.ChatRoom).filter(models.ChatRoom.id == room_id).first()
         if room:
-            for participant in room.participants:
-                if participant.id in self.active_connections:
-                    await self.send_personal_message(message, participant.id)
+            await asyncio.gather(*(
+                self.send_personal_message(message, participant.id)
+                for participant in room.participants
+                if participant.id in self.active_connections
+            ))
+
+    # --- Heartbeats ---
+
+    async def send_heartbeats(self):
+        """Pings every socket concurrently and evicts the ones that have gone quiet."""
+        now = time.monotonic()
+        jobs = []
+        for user_id, sockets in list(self.active_connections.items()):
+            for websocket in list(sockets):
+                if now - self.last_seen.get(websocket, now) > IDLE_TIMEOUT_SECONDS:
+                    jobs.append(self.evict(user_id, websocket, "Heartbeat timeout"))
+                else:
+                    jobs.append(self.send_to_socket(user_id, websocket, {"type": "ping"}))
+        await asyncio.gather(*jobs)
+
+    # --- Presence ---
+
+    def take_presence_changes(self) -> Dict[uuid.UUID, bool]:
+        """
+        Returns the coalesced presence changes since the last call. A user who
+        went offline and came back within one interval produces no event.
+        """
+        changes = {}
+        for user_id, online in self.pending_presence.items():
+            if self.announced_presence.get(user_id, False) != online:
+                changes[user_id] = online
+                if online:
+                    self.announced_presence[user_id] = True
+                else:
+                    self.announced_presence.pop(user_id, None)
+        self.pending_presence = {}
+        return changes
+
+    async def flush_presence(self):
+        """
+        Sends each online contact a single batched presence event covering
+        every change relevant to them, instead of one message per change.
+        """
+        changes = self.take_presence_changes()
+        if not changes:
+            return
+        recipients = await run_in_threadpool(
+            get_online_contacts, list(changes.keys()), list(self.active_connections.keys())
+        )
+        batches: Dict[uuid.UUID, List[dict]] = {}
+        for changed_user_id, contact_id in recipients:
+            batches.setdefault(contact_id, []).append(
+                {"user_id": str(changed_user_id), "online": changes[changed_user_id]}
+            )
+        await asyncio.gather(*(
+            self.send_personal_message({"type": "presence", "changes": batch}, contact_id)
+            for contact_id, batch in batches.items()
+        ))
 
 manager = ConnectionManager()
 
+def get_contact_ids(db: Session, user_ids: List[uuid.UUID], candidate_ids: List[uuid.UUID] | None = None):
+    """
+    Returns (user_id, contact_id) pairs for every user in `user_ids` and each
+    person they share a chat room with, in a single query. Optionally
+    restricted to contacts found in `candidate_ids`.
+    """
+    if not user_ids:
+        return []
+    mine = models.chat_room_participants.alias("mine")
+    theirs = models.chat_room_participants.alias("theirs")
+    query = db.query(mine.c.user_id, theirs.c.user_id).join(
+        theirs, and_(mine.c.room_id == theirs.c.room_id, mine.c.user_id != theirs.c.user_id)
+    ).filter(mine.c.user_id.in_(user_ids))
+    if candidate_ids is not None:
+        if not candidate_ids:
+            return []
+        query = query.filter(theirs.c.user_id.in_(candidate_ids))
+    return query.distinct().all()
+
+def get_online_contacts(user_ids: List[uuid.UUID], online_ids: List[uuid.UUID]):
+    db = database.SessionLocal()
+    try:
+        return get_contact_ids(db, user_ids, online_ids)
+    finally:
+        db.close()
+
+async def run_periodically(interval: float, job):
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await job()
+        except Exception as e:
+            print(f"Periodic socket job {job.__name__} failed: {e}")
+
+@router.on_event("startup")
+async def start_socket_jobs():
+    asyncio.create_task(run_periodically(HEARTBEAT_INTERVAL_SECONDS, manager.send_heartbeats))
+    asyncio.create_task(run_periodically(PRESENCE_FLUSH_INTERVAL_SECONDS, manager.flush_presence))
+
 @router.websocket("/ws/{token}")
 async def websocket_endpoint(websocket: WebSocket, token: str):
     user = None
     db = database.SessionLocal()
+    db.info["client_key"] = token # So reads after sending a message stay on the primary
     try:
         user = auth.get_user_from_token(token, db)
         if not user:
@@ -56,12 +213,24 @@ async def websocket_endpoint(websocket: WebSocket, token: str):
         try:
             while True:
                 data = await websocket.receive_json()
+                manager.touch(websocket)
+                if data.get('type') == 'pong':
+                    continue
+
                 room_id = data.get('room_id')
                 content = data.get('content')
                 
                 if not room_id or not content:
                     continue
 
+                # Checked before any DB work so a flooding client stays cheap.
+                if await ratelimit.limiter.hit("messages", str(user.id)) > 0:
+                    # Echo the client's temporary id so it can roll back its optimistic copy.
+                    await manager.send_to_socket(user.id, websocket, {
+                        "type": "error", "detail": "Too many messages", "client_id": data.get('client_id')
+                    })
+                    continue
+
                 new_message = models.ChatMessage(
                     room_id=room_id, sender_id=user.id, content=content
                 )
@@ -77,9 +246,18 @@ async def websocket_endpoint(websocket: WebSocket, token: str):
             print(f"WebSocket processing error for user {user.id}: {e}")
     finally:
         if user:
-            manager.disconnect(user.id)
+            manager.disconnect(user.id, websocket)
         db.close()
 
+@router.get("/chat/presence")
+def get_contacts_presence(
+    db: Session = Depends(database.get_db),
+    current_user: models.User = Depends(auth.get_current_user)
+):
+    """Returns the ids of the current user's chat contacts who are online right now."""
+    contact_ids = {contact_id for _, contact_id in get_contact_ids(db, [current_user.id])}
+    return {"online": [str(user_id) for user_id in manager.online_users(contact_ids)]}
+
 # --- Chat Room Utilities ---
 
 def construct_chat_room_public(room: models.ChatRoom) -> schemas.ChatRoomPublic:
@@ -133,8 +311,8 @@ def create_or_get_chat_room(
 
 @router.get("/chat/rooms", response_model=List[schemas.ChatRoomPublic])
 def get_user_chat_rooms(
-    db: Session = Depends(database.get_db), 
-    current_user: models.User = Depends(auth.get_current_user)
+    db: Session = Depends(database.get_read_db), 
+    current_user: models.User = Depends(auth.get_current_user_for_read)
 ):
     user_rooms = db.query(models.ChatRoom).filter(
         models.ChatRoom.participants.contains(current_user)
@@ -147,8 +325,8 @@ def get_user_chat_rooms(
 @router.get("/chat/users/search")
 def search_users(
     query: str,
-    db: Session = Depends(database.get_db),
-    current_user: models.User = Depends(auth.get_current_user)
+    db: Session = Depends(database.get_read_db),
+    current_user: models.User = Depends(auth.get_current_user_for_read)
 ):
     if not query.strip():
         return []
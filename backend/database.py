@@ -1,27 +1,231 @@
 # backend/database.py
 
+import asyncio
+import hashlib
 import os # Import the os module to access environment variables
+import threading
+import time
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List
 from dotenv import load_dotenv # Import the function to load the .env file
-from sqlalchemy import create_engine
+from fastapi import Request
+from sqlalchemy import create_engine, event, text
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
 
 # Load environment variables from the .env file
 load_dotenv()
 
 # Now, read the database URL from the environment
 SQLALCHEMY_DATABASE_URL = os.getenv("DATABASE_URL")
+# Optional comma-separated list of read replica URLs
+REPLICA_DATABASE_URLS = [url.strip() for url in os.getenv("DATABASE_REPLICA_URLS", "").split(",") if url.strip()]
+
+READ_YOUR_WRITES_SECONDS = 5      # Reads stay on the primary this long after a client writes
+HEALTH_CHECK_INTERVAL_SECONDS = 30 # How often a healthy replica is re-probed
+RETRY_UNHEALTHY_SECONDS = 10       # How long a failed replica is skipped before it is probed again
+# Shared store for read-your-writes state. Needed when running more than one
+# worker process; without it the state is kept per process.
+READ_YOUR_WRITES_REDIS_URL = os.getenv("READ_YOUR_WRITES_REDIS_URL") or os.getenv("RATE_LIMIT_REDIS_URL")
+REDIS_TIMEOUT_SECONDS = 0.25
+
+# --- Per-Engine Health & Metrics ---
+class EngineState:
+    def __init__(self, name: str, engine):
+        self.name = name
+        self.engine = engine
+        self.healthy = True
+        self.checked_at = time.monotonic()
+        self.queries = 0
+        self.errors = 0
+        self.probe_lock = threading.Lock()
+
+        event.listen(engine, "before_cursor_execute", self.on_query)
+        event.listen(engine, "handle_error", self.on_error)
+
+    def on_query(self, *args):
+        self.queries += 1
+
+    def on_error(self, context):
+        self.errors += 1
+        if context.is_disconnect:
+            self.mark_unhealthy()
+
+    def mark_unhealthy(self):
+        self.healthy = False
+        self.checked_at = time.monotonic()
+
+    def is_usable(self) -> bool:
+        """Returns the health of the engine, probing it if the last check is stale."""
+        interval = HEALTH_CHECK_INTERVAL_SECONDS if self.healthy else RETRY_UNHEALTHY_SECONDS
+        if time.monotonic() - self.checked_at < interval:
+            return self.healthy
+        # Only one request probes at a time; the rest go with the last known state.
+        if not self.probe_lock.acquire(blocking=False):
+            return self.healthy
+        try:
+            with self.engine.connect() as connection:
+                connection.execute(text("SELECT 1"))
+            self.healthy = True
+        except Exception as e:
+            print(f"Database health check failed for {self.name}: {e}")
+            self.healthy = False
+        finally:
+            self.checked_at = time.monotonic()
+            self.probe_lock.release()
+        return self.healthy
+
+    def stats(self) -> dict:
+        pool = self.engine.pool
+        return {
+            "name": self.name,
+            "healthy": self.healthy,
+            "queries": self.queries,
+            "errors": self.errors,
+            "pool_checked_out": pool.checkedout() if hasattr(pool, "checkedout") else None,
+        }
 
 engine = create_engine(SQLALCHEMY_DATABASE_URL)
+primary = EngineState("primary", engine)
+replicas: List[EngineState] = [
+    EngineState(f"replica-{i}", create_engine(url, pool_pre_ping=True))
+    for i, url in enumerate(REPLICA_DATABASE_URLS)
+]
+
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
+def pick_read_engine(client_key: str):
+    """
+    Pins each client to one healthy replica, falling back to the primary.
+    Consecutive reads then see the same replication position, which a
+    client syncing from a token it read earlier relies on.
+    """
+    if not replicas:
+        return engine
+    # crc32 rather than hash(), which differs between worker processes.
+    start = zlib.crc32(client_key.encode())
+    for offset in range(len(replicas)):
+        replica = replicas[(start + offset) % len(replicas)]
+        if replica.is_usable():
+            return replica.engine
+    return engine
+
+def get_engine_stats() -> List[dict]:
+    return [state.stats() for state in [primary, *replicas]]
+
+# --- Read-Your-Writes Tracking ---
+class MemoryWriteTracker:
+    """Last-write times kept in this process. Only correct with a single worker."""
+    MAX_TRACKED_WRITERS = 10_000
+
+    def __init__(self):
+        # client key -> monotonic time of that client's last committed write
+        self.recent_writes: Dict[str, float] = {}
+
+    def record(self, client_key: str):
+        now = time.monotonic()
+        if len(self.recent_writes) > self.MAX_TRACKED_WRITERS:
+            for key, written_at in list(self.recent_writes.items()):
+                if now - written_at >= READ_YOUR_WRITES_SECONDS:
+                    self.recent_writes.pop(key, None)
+        self.recent_writes[client_key] = now
+
+    def wrote_recently(self, client_key: str) -> bool:
+        written_at = self.recent_writes.get(client_key)
+        return written_at is not None and time.monotonic() - written_at < READ_YOUR_WRITES_SECONDS
+
+class RedisWriteTracker:
+    """
+    Last-write markers in Redis, shared by every worker. Each marker expires
+    when the read-your-writes window ends, so its presence is the answer.
+    """
+    def __init__(self, url: str):
+        import redis  # Optional dependency, only needed with several workers
+        self.client = redis.Redis.from_url(
+            url, socket_timeout=REDIS_TIMEOUT_SECONDS, socket_connect_timeout=REDIS_TIMEOUT_SECONDS
+        )
+        # Commits made on the event loop (the chat socket) hand the write off here
+        # instead of blocking the loop on Redis.
+        self.executor = ThreadPoolExecutor(max_workers=1)
+
+    def redis_key(self, client_key: str) -> str:
+        # Keys are bearer tokens, so only a digest is stored.
+        return "ryw:" + hashlib.sha256(client_key.encode()).hexdigest()
+
+    def _set(self, client_key: str):
+        try:
+            self.client.set(self.redis_key(client_key), 1, px=int(READ_YOUR_WRITES_SECONDS * 1000))
+        except Exception as e:
+            print(f"Read-your-writes store error: {e!r}")
+
+    def record(self, client_key: str):
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            self._set(client_key)
+        else:
+            self.executor.submit(self._set, client_key)
+
+    def wrote_recently(self, client_key: str) -> bool:
+        try:
+            return bool(self.client.exists(self.redis_key(client_key)))
+        except Exception as e:
+            # Unknown: the primary is always up to date, so send the read there.
+            print(f"Read-your-writes store error: {e!r}")
+            return True
+
+write_tracker = RedisWriteTracker(READ_YOUR_WRITES_REDIS_URL) if READ_YOUR_WRITES_REDIS_URL else MemoryWriteTracker()
+
+def get_client_key(request: Request) -> str:
+    """Identifies the caller by bearer token, or by IP for anonymous requests."""
+    authorization = request.headers.get("authorization", "")
+    scheme, _, token = authorization.partition(" ")
+    if scheme.lower() == "bearer" and token:
+        return token
+    return f"ip:{request.client.host if request.client else 'unknown'}"
+
+@event.listens_for(Session, "after_flush")
+def mark_session_wrote(session, flush_context):
+    session.info["wrote"] = True
+
+@event.listens_for(Session, "do_orm_execute")
+def mark_session_bulk_wrote(orm_execute_state):
+    # Bulk update()/delete()/insert() statements bypass the flush.
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        orm_execute_state.session.info["wrote"] = True
+
+@event.listens_for(Session, "after_commit")
+def remember_client_write(session):
+    wrote = session.info.pop("wrote", False)
+    # Without replicas every read goes to the primary; nothing to remember.
+    if not replicas:
+        return
+    client_key = session.info.get("client_key")
+    if wrote and client_key:
+        write_tracker.record(client_key)
+
 # Dependency to get a DB session for each request
-def get_db():
+def get_db(request: Request):
     db = SessionLocal()
+    db.info["client_key"] = get_client_key(request)
     try:
         yield db
     finally:
         db.close()
 
-
+# Dependency for read-only routes: a replica session, unless this client
+# wrote recently or no replica is healthy, in which case the primary.
+def get_read_db(request: Request):
+    client_key = get_client_key(request)
+    if not replicas or write_tracker.wrote_recently(client_key):
+        bind = engine
+    else:
+        bind = pick_read_engine(client_key)
+    db = SessionLocal(bind=bind)
+    db.info["client_key"] = client_key
+    try:
+        yield db
+    finally:
+        db.close()
@@ -0,0 +1,213 @@
+# backend/export.py
+"""
+Streaming NDJSON/CSV export of posts, chat messages and attachment metadata.
+
+Rows are fetched with a server-side cursor (`yield_per`) and written out as
+they arrive, so memory stays flat no matter how many rows are exported.
+Binary data is never inlined; photos and attachments are exported as URLs.
+
+Usage from the command line:
+    python export.py messages --company "Acme" --since 2024-01-01 -o messages.ndjson
+    python export.py posts --format csv --gzip -o posts.csv.gz
+"""
+import argparse
+import csv
+import io
+import json
+import sys
+import uuid
+import zlib
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Iterator, Literal, Optional
+
+from fastapi import APIRouter, Depends, Query
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select
+
+import models, auth, database
+
+router = APIRouter(prefix="/admin/export", tags=["Export"])
+
+FETCH_SIZE = 1000          # Rows per server-side cursor fetch
+CHUNK_SIZE = 64 * 1024     # Bytes buffered before a chunk is sent to the client
+
+# --- Filters & Datasets ---
+
+@dataclass
+class ExportFilters:
+    user_id: Optional[uuid.UUID] = None   # Post owner / message or attachment sender
+    room_id: Optional[uuid.UUID] = None
+    company: Optional[str] = None
+    since: Optional[datetime] = None
+    until: Optional[datetime] = None
+
+def posts_query(filters: ExportFilters):
+    query = select(
+        models.Post.id, models.Post.title, models.Post.summary, models.Post.description,
+        models.Post.contact_info, models.Post.is_hidden, models.Post.created_at, models.Post.updated_at,
+        models.Post.owner_id, models.User.email.label("owner_email"), models.User.company.label("owner_company"),
+    ).join(models.User, models.Post.owner_id == models.User.id)
+    if filters.user_id:
+        query = query.where(models.Post.owner_id == filters.user_id)
+    return apply_common_filters(query, models.Post.created_at, filters).order_by(models.Post.created_at, models.Post.id)
+
+def messages_query(filters: ExportFilters):
+    query = select(
+        models.ChatMessage.id, models.ChatMessage.room_id, models.ChatMessage.sender_id,
+        models.User.email.label("sender_email"), models.User.company.label("sender_company"),
+        models.ChatMessage.content, models.ChatMessage.created_at,
+    ).join(models.User, models.ChatMessage.sender_id == models.User.id)
+    if filters.user_id:
+        query = query.where(models.ChatMessage.sender_id == filters.user_id)
+    if filters.room_id:
+        query = query.where(models.ChatMessage.room_id == filters.room_id)
+    return apply_common_filters(query, models.ChatMessage.created_at, filters).order_by(models.ChatMessage.created_at, models.ChatMessage.id)
+
+def attachments_query(filters: ExportFilters):
+    query = select(
+        models.ChatAttachment.id, models.ChatAttachment.room_id, models.ChatAttachment.sender_id,
+        models.User.email.label("sender_email"), models.User.company.label("sender_company"),
+        models.ChatAttachment.filename, models.ChatAttachment.content_type, models.ChatAttachment.uploaded_at,
+    ).join(models.User, models.ChatAttachment.sender_id == models.User.id)
+    if filters.user_id:
+        query = query.where(models.ChatAttachment.sender_id == filters.user_id)
+    if filters.room_id:
+        query = query.where(models.ChatAttachment.room_id == filters.room_id)
+    return apply_common_filters(query, models.ChatAttachment.uploaded_at, filters).order_by(models.ChatAttachment.uploaded_at, models.ChatAttachment.id)
+
+def apply_common_filters(query, timestamp_column, filters: ExportFilters):
+    if filters.company:
+        query = query.where(models.User.company == filters.company)
+    if filters.since:
+        query = query.where(timestamp_column >= filters.since)
+    if filters.until:
+        query = query.where(timestamp_column < filters.until)
+    return query
+
+# dataset -> (query builder, name and URL template of the reference column)
+DATASETS = {
+    "posts": (posts_query, ("photo_url", "/posts/{id}/photo")),
+    "messages": (messages_query, None),
+    "attachments": (attachments_query, ("file_url", "/chat/file/{id}")),
+}
+
+# --- Encoding ---
+
+def to_json_value(value):
+    if isinstance(value, uuid.UUID):
+        return str(value)
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+def iter_records(dataset: str, filters: ExportFilters) -> Iterator[dict]:
+    """Yields one dict per row, streaming from the database."""
+    build_query, reference = DATASETS[dataset]
+    db = database.SessionLocal()
+    try:
+        result = db.execute(build_query(filters).execution_options(yield_per=FETCH_SIZE))
+        for row in result:
+            record = {key: to_json_value(value) for key, value in row._mapping.items()}
+            if reference:
+                name, template = reference
+                record[name] = template.format(id=record["id"])
+            yield record
+    finally:
+        db.close()
+
+def iter_lines(records: Iterator[dict], file_format: str) -> Iterator[str]:
+    if file_format == "ndjson":
+        for record in records:
+            yield json.dumps(record) + "\n"
+        return
+
+    buffer = io.StringIO()
+    writer = None
+    for record in records:
+        if writer is None:
+            writer = csv.DictWriter(buffer, fieldnames=list(record.keys()))
+            writer.writeheader()
+        writer.writerow(record)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+
+def iter_chunks(lines: Iterator[str], compress: bool) -> Iterator[bytes]:
+    """Groups lines into ~CHUNK_SIZE byte chunks, gzipping them on the fly if asked."""
+    # wbits=31 produces a gzip container rather than a raw zlib stream.
+    compressor = zlib.compressobj(wbits=31) if compress else None
+    pending = []
+    pending_size = 0
+    for line in lines:
+        data = line.encode("utf-8")
+        pending.append(data)
+        pending_size += len(data)
+        if pending_size >= CHUNK_SIZE:
+            chunk = b"".join(pending)
+            pending, pending_size = [], 0
+            chunk = compressor.compress(chunk) if compressor else chunk
+            if chunk:
+                yield chunk
+    chunk = b"".join(pending)
+    if compressor:
+        chunk = compressor.compress(chunk) + compressor.flush()
+    if chunk:
+        yield chunk
+
+def export_stream(dataset: str, filters: ExportFilters, file_format: str, compress: bool) -> Iterator[bytes]:
+    return iter_chunks(iter_lines(iter_records(dataset, filters), file_format), compress)
+
+# --- Routes ---
+
+@router.get("/{dataset}")
+def export_dataset(
+    dataset: Literal["posts", "messages", "attachments"],
+    file_format: Literal["ndjson", "csv"] = Query("ndjson", alias="format"),
+    gzip: bool = False,
+    user_id: Optional[uuid.UUID] = None,
+    room_id: Optional[uuid.UUID] = None,
+    company: Optional[str] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    current_admin: models.User = Depends(auth.require_admin)
+):
+    filters = ExportFilters(user_id=user_id, room_id=room_id, company=company, since=since, until=until)
+    filename = f"{dataset}.{file_format}" + (".gz" if gzip else "")
+    if gzip:
+        media_type = "application/gzip"
+    else:
+        media_type = "application/x-ndjson" if file_format == "ndjson" else "text/csv"
+    headers = {"Content-Disposition": f"attachment; filename={filename}"}
+    # A sync generator is iterated in a threadpool, so the DB cursor never blocks the event loop.
+    return StreamingResponse(export_stream(dataset, filters, file_format, gzip), media_type=media_type, headers=headers)
+
+# --- CLI ---
+
+def main():
+    parser = argparse.ArgumentParser(description="Export posts, chat messages or attachment metadata.")
+    parser.add_argument("dataset", choices=list(DATASETS.keys()))
+    parser.add_argument("--format", choices=["ndjson", "csv"], default="ndjson")
+    parser.add_argument("--gzip", action="store_true")
+    parser.add_argument("--user-id", type=uuid.UUID)
+    parser.add_argument("--room-id", type=uuid.UUID)
+    parser.add_argument("--company")
+    parser.add_argument("--since", type=datetime.fromisoformat)
+    parser.add_argument("--until", type=datetime.fromisoformat)
+    parser.add_argument("-o", "--output", help="Defaults to stdout")
+    args = parser.parse_args()
+
+    filters = ExportFilters(
+        user_id=args.user_id, room_id=args.room_id, company=args.company,
+        since=args.since, until=args.until
+    )
+    output = open(args.output, "wb") if args.output else sys.stdout.buffer
+    try:
+        for chunk in export_stream(args.dataset, filters, args.format, args.gzip):
+            output.write(chunk)
+    finally:
+        if args.output:
+            output.close()
+
+if __name__ == "__main__":
+    main()
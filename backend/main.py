@@ -8,18 +8,23 @@ from typing import List
 import uuid
 
 # Import local modules
-import models, schemas, auth, database, posts, chat
+import models, schemas, auth, database, posts, chat, ratelimit, admin, export
 
 database.Base.metadata.create_all(bind=database.engine) 
 
 app = FastAPI(title="RiskWatch API")
 
+# Per-user / per-IP budgets for login, uploads and post creation.
+# Registered before CORS so that 429 responses still carry CORS headers.
+app.middleware("http")(ratelimit.rate_limit_middleware)
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["http://localhost:5173"],
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[posts.CHANGE_TOKEN_HEADER],
 )
 
 
@@ -84,7 +89,7 @@ async def upload_photo(file: UploadFile = File(...), db: Session = Depends(datab
     return {"message": "Photo uploaded successfully"}
 
 @app.get("/users/{user_id}/photo")
-def get_user_photo(user_id: uuid.UUID, db: Session = Depends(database.get_db)):
+def get_user_photo(user_id: uuid.UUID, db: Session = Depends(database.get_read_db)):
     user = db.query(models.User).filter(models.User.id == user_id).first()
     if not user or not user.photo:
         raise HTTPException(status_code=404, detail="Photo not found")
@@ -92,4 +97,7 @@ def get_user_photo(user_id: uuid.UUID, db: Session = Depends(database.get_db)):
 
 # --- Include Routers from other files ---
 app.include_router(posts.router)
-app.include_router(chat.router)
\ No newline at end of file
+app.include_router(chat.router)
+app.include_router(ratelimit.router)
+app.include_router(admin.router)
+app.include_router(export.router)
\ No newline at end of file
@@ -1,6 +1,8 @@
 import uuid
 from sqlalchemy import (
     Column,
+    Integer,
+    BigInteger,
     String,
     Boolean,
     LargeBinary,
@@ -69,11 +71,26 @@ class Post(Base):
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
     
     # Foreign key to link to the 'users' table
-    owner_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False)
+    owner_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), index=True, nullable=False)
     
     # Relationship back to the User object
     owner = relationship("User", back_populates="posts")
 
+class PostChange(Base):
+    """
+    Append-only log of post writes. The auto-incrementing id is the change
+    token clients sync from; rows with deleted=True are tombstones for posts
+    that no longer exist.
+    """
+    __tablename__ = "post_changes"
+
+    # SQLite only auto-increments INTEGER primary keys.
+    id = Column(BigInteger().with_variant(Integer, "sqlite"), primary_key=True, autoincrement=True)
+    post_id = Column(UUID(as_uuid=True), index=True, nullable=False)
+    owner_id = Column(UUID(as_uuid=True), index=True, nullable=False)
+    deleted = Column(Boolean, default=False, nullable=False)
+    changed_at = Column(DateTime(timezone=True), server_default=func.now())
+
 class ChatRoom(Base):
     __tablename__ = "chat_rooms"
     
@@ -101,8 +118,8 @@ class ChatMessage(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
     # Foreign keys to link messages to rooms and senders
-    room_id = Column(UUID(as_uuid=True), ForeignKey("chat_rooms.id"), nullable=False)
-    sender_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False)
+    room_id = Column(UUID(as_uuid=True), ForeignKey("chat_rooms.id"), index=True, nullable=False)
+    sender_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), index=True, nullable=False)
     
     # --- Relationships ---
     room = relationship("ChatRoom", back_populates="messages")
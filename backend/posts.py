@@ -1,7 +1,10 @@
 # backend/posts.py
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Form
-from sqlalchemy.orm import Session
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Form, Response
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session, joinedload, aliased
+from apscheduler.schedulers.background import BackgroundScheduler
+from sqlalchemy import func, text
+from typing import List, Optional
 from PIL import Image
 from io import BytesIO
 import uuid
@@ -10,6 +13,9 @@ import models, schemas, auth, database
 
 router = APIRouter(prefix="/posts", tags=["Posts"])
 TILE_DIMENSIONS = (400, 300)
+MAX_CHANGES_PER_SYNC = 500
+POST_CHANGES_LOCK_KEY = 7301 # Postgres advisory lock guarding appends to post_changes
+CHANGE_TOKEN_HEADER = "X-Change-Token" # Sync token matching a full listing
 
 def resize_image(image_data: bytes) -> bytes:
     image = Image.open(BytesIO(image_data))
@@ -43,6 +49,92 @@ def construct_post_public(post: models.Post) -> schemas.PostPublic:
         photo=post.photo # Pass raw photo bytes for PhotoUrl conversion
     )
 
+# --- CHANGE LOG FOR DELTA SYNC ---
+def lock_post_changes(db: Session):
+    """
+    Serializes appends to the change log until this transaction ends.
+
+    Change ids come from a sequence when the row is inserted, not when it
+    commits. Without the lock, id 11 could commit before id 10, and a client
+    syncing in between would be handed token 11 and never see change 10.
+    Holding the lock from before the id is drawn until commit makes ids
+    commit in order, so every committed prefix (on the primary or on a
+    replica replaying it) has no gaps. SQLite already allows only one writer
+    at a time, so it needs no lock.
+    """
+    if db.get_bind().dialect.name == "postgresql":
+        db.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": POST_CHANGES_LOCK_KEY})
+
+def record_post_change(db: Session, post: models.Post, deleted: bool = False):
+    """Appends to the change log in the same transaction as the post write."""
+    lock_post_changes(db)
+    db.add(models.PostChange(post_id=post.id, owner_id=post.owner_id, deleted=deleted))
+
+def get_post_changes(db: Session, since: Optional[int], owner_id: Optional[uuid.UUID] = None) -> schemas.PostChanges:
+    """
+    Returns what changed after the `since` token. Without a token, returns
+    only the current token so a client can start syncing after a full fetch.
+    When `owner_id` is None this is the public feed, so hidden posts are
+    reported as removed rather than sent.
+    """
+    if since is None:
+        latest = db.query(func.max(models.PostChange.id)).scalar() or 0
+        return schemas.PostChanges(next_token=latest, upserted=[], removed=[], has_more=False)
+
+    query = db.query(models.PostChange.id, models.PostChange.post_id, models.PostChange.deleted).filter(
+        models.PostChange.id > since
+    )
+    if owner_id is not None:
+        query = query.filter(models.PostChange.owner_id == owner_id)
+    changes = query.order_by(models.PostChange.id).limit(MAX_CHANGES_PER_SYNC).all()
+    if not changes:
+        return schemas.PostChanges(next_token=since, upserted=[], removed=[], has_more=False)
+
+    # Later entries for the same post supersede earlier ones.
+    latest_state = {}
+    for change in changes:
+        latest_state[change.post_id] = change.deleted
+
+    live_ids = [post_id for post_id, deleted in latest_state.items() if not deleted]
+    posts = {}
+    if live_ids:
+        posts = {
+            post.id: post for post in db.query(models.Post).options(joinedload(models.Post.owner)).filter(models.Post.id.in_(live_ids))
+        }
+
+    upserted, removed = [], []
+    for post_id, deleted in latest_state.items():
+        post = posts.get(post_id)
+        # A post missing here was deleted after this window; its tombstone comes in a later sync.
+        if deleted or post is None or (owner_id is None and post.is_hidden):
+            removed.append(post_id)
+        else:
+            upserted.append(construct_post_public(post))
+
+    return schemas.PostChanges(
+        next_token=changes[-1].id, upserted=upserted, removed=removed,
+        has_more=len(changes) == MAX_CHANGES_PER_SYNC
+    )
+
+def compact_post_changes():
+    """
+    Drops log entries superseded by a later entry for the same post. Any
+    client token still sees the latest state, so no sync information is lost.
+    """
+    db = database.SessionLocal()
+    later = aliased(models.PostChange)
+    db.query(models.PostChange).filter(
+        db.query(later).filter(later.post_id == models.PostChange.post_id, later.id > models.PostChange.id).exists()
+    ).delete(synchronize_session=False)
+    db.commit()
+    db.close()
+
+@router.on_event("startup")
+def start_compaction_job():
+    scheduler = BackgroundScheduler()
+    scheduler.add_job(compact_post_changes, "interval", days=1)
+    scheduler.start()
+
 @router.post("/", response_model=schemas.PostPublic, status_code=status.HTTP_201_CREATED)
 async def create_post(
     title: str = Form(...), description: str = Form(...), summary: str = Form(...),
@@ -56,27 +148,53 @@ async def create_post(
         photo=resized_image_bytes, owner_id=current_user.id
     )
     db.add(new_post)
+    db.flush() # Assigns the id needed by the change log
+    record_post_change(db, new_post)
     db.commit()
     db.refresh(new_post)
     return construct_post_public(new_post)
 
 @router.get("/", response_model=List[schemas.PostPublic])
-def get_all_posts(db: Session = Depends(database.get_db)):
+def get_all_posts(db: Session = Depends(database.get_read_db)):
     posts = db.query(models.Post).filter(models.Post.is_hidden == False).order_by(models.Post.created_at.desc()).all()
     return [construct_post_public(post) for post in posts if post]
 
 @router.get("/me", response_model=List[schemas.PostPublic])
-def get_my_posts(db: Session = Depends(database.get_db), current_user: models.User = Depends(auth.get_current_user)):
+def get_my_posts(
+    response: Response, db: Session = Depends(database.get_read_db),
+    current_user: models.User = Depends(auth.get_current_user_for_read)
+):
+    # The token is read first and from the same database as the list, so a
+    # sync from it can only replay changes the list already has, never miss one.
+    response.headers[CHANGE_TOKEN_HEADER] = str(get_post_changes(db, None).next_token)
     posts = db.query(models.Post).filter(models.Post.owner_id == current_user.id).order_by(models.Post.created_at.desc()).all()
     return [construct_post_public(post) for post in posts if post]
 
+@router.get("/changes", response_model=schemas.PostChanges)
+def get_feed_changes(since: Optional[int] = None, db: Session = Depends(database.get_read_db)):
+    return get_post_changes(db, since)
+
+@router.get("/me/changes", response_model=schemas.PostChanges)
+def get_my_post_changes(
+    since: Optional[int] = None, db: Session = Depends(database.get_read_db),
+    current_user: models.User = Depends(auth.get_current_user_for_read)
+):
+    return get_post_changes(db, since, owner_id=current_user.id)
+
 @router.get("/{post_id}", response_model=schemas.PostPublic)
-def get_single_post(post_id: uuid.UUID, db: Session = Depends(database.get_db)):
+def get_single_post(post_id: uuid.UUID, db: Session = Depends(database.get_read_db)):
     post = db.query(models.Post).filter(models.Post.id == post_id).first()
     if not post:
         raise HTTPException(status_code=404, detail="Post not found")
     return construct_post_public(post)
 
+@router.get("/{post_id}/photo")
+def get_post_photo(post_id: uuid.UUID, db: Session = Depends(database.get_read_db)):
+    photo = db.query(models.Post.photo).filter(models.Post.id == post_id).scalar()
+    if not photo:
+        raise HTTPException(status_code=404, detail="Photo not found")
+    return StreamingResponse(BytesIO(photo), media_type="image/png")
+
 @router.put("/{post_id}", response_model=schemas.PostPublic)
 def update_post(
     post_id: uuid.UUID, post_update: schemas.PostUpdate, db: Session = Depends(database.get_db),
@@ -88,6 +206,7 @@ def update_post(
         raise HTTPException(status_code=403, detail="Not authorized")
     
     post_query.update(post_update.model_dump(exclude_unset=True), synchronize_session=False)
+    record_post_change(db, post)
     db.commit()
     updated_post = post_query.first()
     return construct_post_public(updated_post)
@@ -102,6 +221,7 @@ def toggle_post_visibility(
         raise HTTPException(status_code=403, detail="Not authorized")
     
     post.is_hidden = not post.is_hidden
+    record_post_change(db, post)
     db.commit()
     db.refresh(post)
     return construct_post_public(post)
@@ -115,6 +235,7 @@ def delete_post(
     if not post or post.owner_id != current_user.id:
         raise HTTPException(status_code=403, detail="Not authorized")
     
+    record_post_change(db, post, deleted=True)
     db.delete(post)
     db.commit()
     return
\ No newline at end of file
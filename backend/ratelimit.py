@@ -0,0 +1,254 @@
+# backend/ratelimit.py
+
+import asyncio
+import json
+import math
+import os
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass
+from typing import Dict, List, Tuple
+
+from dotenv import load_dotenv
+from fastapi import APIRouter, Depends, Request
+from fastapi.responses import JSONResponse
+
+import models, auth
+
+load_dotenv()
+
+router = APIRouter(tags=["Rate Limits"])
+
+# --- Budgets ---
+@dataclass(frozen=True)
+class Budget:
+    rate: float   # Tokens refilled per second
+    burst: float  # Bucket capacity, i.e. the most that can be spent at once
+
+MB = 1024 * 1024
+
+BUDGETS: Dict[str, Budget] = {
+    "messages": Budget(rate=5, burst=20),                    # Chat messages per user
+    "upload_bytes": Budget(rate=20 * MB / 60, burst=25 * MB), # Bytes uploaded per user / per IP
+    "posts": Budget(rate=10 / 60, burst=5),                  # Posts created per user
+    "login": Budget(rate=30 / 60, burst=60),                 # Login attempts per IP (may be a shared NAT)
+    "login_account": Budget(rate=5 / 60, burst=10),          # Login attempts per submitted email
+}
+
+# If set, buckets live in Redis and are shared by every worker process.
+RATE_LIMIT_REDIS_URL = os.getenv("RATE_LIMIT_REDIS_URL")
+REDIS_TIMEOUT_SECONDS = 0.25
+# What to do when Redis is down or slow: let requests through (default) or reject them.
+RATE_LIMIT_FAIL_OPEN = os.getenv("RATE_LIMIT_FAIL_OPEN", "true").lower() != "false"
+FAIL_CLOSED_RETRY_SECONDS = 5
+
+# --- Backends ---
+# A charge is (bucket key, budget, cost). Backends take a list of charges and
+# spend them all or none: every bucket is checked first, so a request rejected
+# by one bucket does not drain the others.
+Charge = Tuple[str, Budget, float]
+
+class MemoryBackend:
+    """Token buckets kept in this process. Fine for a single worker."""
+    MAX_KEYS = 10_000
+
+    def __init__(self):
+        self.buckets: Dict[str, Tuple[float, float]] = {}
+        self.lock = threading.Lock()
+
+    async def take(self, charges: List[Charge]) -> List[float]:
+        """Returns the wait in seconds for each charge; all zero means spent."""
+        now = time.monotonic()
+        with self.lock:
+            levels = []
+            for key, budget, cost in charges:
+                tokens, updated = self.buckets.get(key, (budget.burst, now))
+                levels.append(min(budget.burst, tokens + (now - updated) * budget.rate))
+            waits = [
+                max(0.0, (cost - tokens) / budget.rate)
+                for (_, budget, cost), tokens in zip(charges, levels)
+            ]
+            allowed = not any(waits)
+            for (key, _, cost), tokens in zip(charges, levels):
+                self.buckets[key] = (tokens - cost if allowed else tokens, now)
+            if len(self.buckets) > self.MAX_KEYS:
+                self._prune(now)
+        return waits
+
+    def _prune(self, now: float):
+        # Buckets that idled long enough to refill completely carry no state.
+        for key, (tokens, updated) in list(self.buckets.items()):
+            budget = BUDGETS[key.split(":", 1)[0]]
+            if tokens + (now - updated) * budget.rate >= budget.burst:
+                del self.buckets[key]
+
+class RedisBackend:
+    """Token buckets in Redis, updated atomically by a Lua script."""
+    # ARGV: now, then rate, burst, cost, ttl for each key.
+    SCRIPT = """
+    local now = tonumber(ARGV[1])
+    local levels = {}
+    local waits = {}
+    local allowed = true
+    for i, key in ipairs(KEYS) do
+        local base = 1 + (i - 1) * 4
+        local rate = tonumber(ARGV[base + 1])
+        local burst = tonumber(ARGV[base + 2])
+        local cost = tonumber(ARGV[base + 3])
+        local data = redis.call('HMGET', key, 'tokens', 'updated')
+        local tokens = tonumber(data[1]) or burst
+        local updated = tonumber(data[2]) or now
+        tokens = math.min(burst, tokens + math.max(0, now - updated) * rate)
+        levels[i] = tokens
+        waits[i] = 0
+        if tokens < cost then
+            waits[i] = (cost - tokens) / rate
+            allowed = false
+        end
+    end
+    for i, key in ipairs(KEYS) do
+        local base = 1 + (i - 1) * 4
+        local tokens = levels[i]
+        if allowed then
+            tokens = tokens - tonumber(ARGV[base + 3])
+        end
+        redis.call('HSET', key, 'tokens', tokens, 'updated', now)
+        redis.call('EXPIRE', key, tonumber(ARGV[base + 4]))
+        waits[i] = tostring(waits[i])
+    end
+    return waits
+    """
+
+    def __init__(self, url: str):
+        import redis.asyncio  # Optional dependency, only needed for shared rate limits
+        self.client = redis.asyncio.Redis.from_url(
+            url, socket_timeout=REDIS_TIMEOUT_SECONDS, socket_connect_timeout=REDIS_TIMEOUT_SECONDS
+        )
+        self.script = self.client.register_script(self.SCRIPT)
+
+    async def take(self, charges: List[Charge]) -> List[float]:
+        args = [time.time()]
+        for _, budget, cost in charges:
+            args += [budget.rate, budget.burst, cost, math.ceil(budget.burst / budget.rate) + 1]
+        waits = await self.script(keys=[f"ratelimit:{key}" for key, _, _ in charges], args=args)
+        return [float(wait) for wait in waits]
+
+# --- Limiter ---
+class RateLimiter:
+    def __init__(self, backend):
+        self.backend = backend
+        self.throttled: Counter = Counter()
+        self.backend_errors = 0
+
+    async def hit(self, budget_name: str, key: str, cost: float = 1) -> float:
+        """
+        Spends `cost` tokens from the bucket `budget_name` for `key`.
+        Returns 0 if allowed, otherwise the number of seconds to wait.
+        """
+        return await self.hit_all([(budget_name, key, cost)])
+
+    async def hit_all(self, charges: List[Tuple[str, str, float]]) -> float:
+        """
+        Spends every (budget_name, key, cost) charge if all of them fit, and
+        none otherwise. Returns 0 if allowed, otherwise the longest wait.
+        If the backend fails or times out, applies RATE_LIMIT_FAIL_OPEN.
+        """
+        if not charges:
+            return 0.0
+        try:
+            waits = await asyncio.wait_for(
+                self.backend.take([(f"{name}:{key}", BUDGETS[name], cost) for name, key, cost in charges]),
+                REDIS_TIMEOUT_SECONDS * 2
+            )
+        except Exception as e:
+            self.backend_errors += 1
+            print(f"Rate limit backend error: {e!r}")
+            return 0.0 if RATE_LIMIT_FAIL_OPEN else FAIL_CLOSED_RETRY_SECONDS
+        for (budget_name, _, _), wait in zip(charges, waits):
+            if wait > 0:
+                self.throttled[budget_name] += 1
+        return max(waits)
+
+limiter = RateLimiter(RedisBackend(RATE_LIMIT_REDIS_URL) if RATE_LIMIT_REDIS_URL else MemoryBackend())
+
+# --- HTTP Middleware ---
+
+# (method, path) -> budgets charged per request. "upload_bytes" is charged by
+# Content-Length; everything else costs one token.
+LIMITED_ROUTES: Dict[Tuple[str, str], List[str]] = {
+    ("POST", "/login"): ["login", "login_account"],
+    ("POST", "/chat/upload"): ["upload_bytes"],
+    ("POST", "/users/me/photo"): ["upload_bytes"],
+    ("POST", "/posts/"): ["posts", "upload_bytes"],
+}
+
+def too_many_requests(wait: float) -> JSONResponse:
+    return JSONResponse(
+        status_code=429,
+        content={"detail": "Too many requests"},
+        headers={"Retry-After": str(math.ceil(wait))},
+    )
+
+def get_request_user_key(request: Request) -> str | None:
+    authorization = request.headers.get("authorization", "")
+    scheme, _, token = authorization.partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        return None
+    user_id = auth.get_user_id_from_token(token)
+    return str(user_id) if user_id else None
+
+async def get_login_account_key(request: Request) -> str | None:
+    """
+    Peeks at the submitted email so that guessing one account's password is
+    limited however many IPs it comes from. Starlette replays the body to the route.
+    """
+    try:
+        email = json.loads(await request.body()).get("email")
+    except (ValueError, AttributeError):
+        return None  # Malformed; the route rejects it without checking a password
+    return email.strip().lower() if isinstance(email, str) and email.strip() else None
+
+async def rate_limit_middleware(request: Request, call_next):
+    """
+    Rejects over-budget requests before the user is loaded or anything is
+    written, so throttled clients cost almost nothing. Only /login bodies are
+    read here, to find the account.
+    """
+    budget_names = LIMITED_ROUTES.get((request.method, request.url.path))
+    if not budget_names:
+        return await call_next(request)
+
+    ip_key = f"ip:{request.client.host if request.client else 'unknown'}"
+    user_key = get_request_user_key(request)
+
+    charges = []
+    for budget_name in budget_names:
+        cost = 1
+        if budget_name == "upload_bytes":
+            content_length = request.headers.get("content-length")
+            if content_length is None or not content_length.isdigit():
+                return JSONResponse(status_code=411, content={"detail": "Content-Length required"})
+            cost = int(content_length)
+            if cost > BUDGETS[budget_name].burst:
+                return JSONResponse(status_code=413, content={"detail": "Upload too large"})
+
+        # Login is limited per IP and per account; everything else per user and per IP.
+        if budget_name == "login":
+            keys = [ip_key]
+        elif budget_name == "login_account":
+            keys = [await get_login_account_key(request)]
+        else:
+            keys = [user_key, ip_key]
+        charges += [(budget_name, key, cost) for key in keys if key]
+
+    # All buckets are checked together, so a rejection spends nothing.
+    wait = await limiter.hit_all(charges)
+    if wait > 0:
+        return too_many_requests(wait)
+    return await call_next(request)
+
+@router.get("/admin/rate-limits")
+def get_rate_limit_stats(current_user: models.User = Depends(auth.require_admin)):
+    """Throttled request counts for this worker, per budget."""
+    return {"throttled": dict(limiter.throttled), "backend_errors": limiter.backend_errors}
@@ -100,6 +100,12 @@ class PostPublic(BaseModel):
     
     model_config = ConfigDict(from_attributes=True)
     
+class PostChanges(BaseModel):
+    next_token: int # Pass back as `since` on the next call
+    upserted: List[PostPublic] # Created or updated since the token
+    removed: List[uuid.UUID] # Deleted, or hidden from the public feed
+    has_more: bool # True if another call is needed to catch up
+
 class PostCreate(BaseModel):
     title: str
     description: str
@@ -125,4 +131,41 @@ class ChatRoomPublic(BaseModel):
     name: Optional[str] = None
     participants: List[UserPublic]
     messages: List[ChatMessagePublic]
-    model_config = ConfigDict(from_attributes=True)
\ No newline at end of file
+    model_config = ConfigDict(from_attributes=True)
+
+# --- ADMIN SCHEMAS ---
+class AdminUserSummary(BaseModel):
+    id: uuid.UUID
+    name: str
+    email: EmailStr
+    phone: Optional[str]
+    role: str
+    company: Optional[str]
+    designation: Optional[str]
+    force_reset: bool
+    profile_complete: bool
+    created_at: datetime
+    has_photo: bool
+    post_count: int
+    message_count: int
+
+class AdminUserPage(BaseModel):
+    items: List[AdminUserSummary]
+    next_cursor: Optional[str] = None # Pass back as `cursor` to fetch the next page
+
+class BulkUserIds(BaseModel):
+    user_ids: List[uuid.UUID] = Field(min_length=1, max_length=1000)
+
+class BulkActionResult(BaseModel):
+    affected: int
+
+class UserImportError(BaseModel):
+    row: int
+    email: Optional[str] = None
+    error: str
+
+class UserImportReport(BaseModel):
+    total: int = 0
+    created: int = 0
+    failed: int = 0
+    errors: List[UserImportError] = [] # Capped; `failed` has the full count
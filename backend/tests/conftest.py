@@ -0,0 +1,16 @@
+# backend/tests/conftest.py
+import os
+import sys
+import tempfile
+
+# The backend modules import each other by bare name and read their settings
+# at import time, so both have to be in place before any test imports them.
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Point TEST_DATABASE_URL at a scratch Postgres database to run against
+# Postgres; otherwise a throwaway SQLite file is used.
+os.environ["DATABASE_URL"] = os.getenv(
+    "TEST_DATABASE_URL", f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'test.sqlite')}"
+)
+os.environ.setdefault("SECRET_KEY", "test-secret")
+os.environ.setdefault("ALGORITHM", "HS256")
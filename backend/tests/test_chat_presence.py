@@ -0,0 +1,54 @@
+# backend/tests/test_chat_presence.py
+import asyncio
+import uuid
+
+import chat
+
+class FakeSocket:
+    async def accept(self):
+        pass
+
+def connect(manager, user_id):
+    socket = FakeSocket()
+    asyncio.run(manager.connect(user_id, socket))
+    return socket
+
+def test_presence_changes_are_coalesced():
+    manager = chat.ConnectionManager()
+    alice, bob = uuid.uuid4(), uuid.uuid4()
+
+    alice_socket = connect(manager, alice)
+    connect(manager, bob)
+    assert manager.take_presence_changes() == {alice: True, bob: True}
+    assert manager.take_presence_changes() == {}
+
+    # Offline and back within one interval: nothing to announce.
+    manager.disconnect(alice, alice_socket)
+    alice_socket = connect(manager, alice)
+    assert manager.take_presence_changes() == {}
+
+    manager.disconnect(alice, alice_socket)
+    assert manager.take_presence_changes() == {alice: False}
+
+def test_presence_follows_last_socket():
+    manager = chat.ConnectionManager()
+    user = uuid.uuid4()
+    first, second = connect(manager, user), connect(manager, user)
+    assert manager.take_presence_changes() == {user: True}
+
+    # Closing one of several tabs leaves the user online.
+    manager.disconnect(user, first)
+    manager.disconnect(user, first)
+    assert manager.take_presence_changes() == {}
+    assert manager.is_online(user)
+
+    manager.disconnect(user, second)
+    assert manager.take_presence_changes() == {user: False}
+    assert not manager.is_online(user)
+
+def test_online_blip_is_not_announced():
+    manager = chat.ConnectionManager()
+    user = uuid.uuid4()
+    socket = connect(manager, user)
+    manager.disconnect(user, socket)
+    assert manager.take_presence_changes() == {}
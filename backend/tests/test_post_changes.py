@@ -0,0 +1,56 @@
+# backend/tests/test_post_changes.py
+import threading
+import time
+import uuid
+from types import SimpleNamespace
+
+import database, models, posts
+
+database.Base.metadata.create_all(bind=database.engine)
+
+def fake_post():
+    return SimpleNamespace(id=uuid.uuid4(), owner_id=uuid.uuid4())
+
+def sync_all(since):
+    db = database.SessionLocal()
+    try:
+        changes = posts.get_post_changes(db, since)
+        return changes.next_token, changes.removed
+    finally:
+        db.close()
+
+def test_uncommitted_lower_id_is_not_skipped():
+    start, _ = sync_all(None)
+    first, second = fake_post(), fake_post()
+
+    # Writer A draws the lower change id and keeps its transaction open.
+    writer_a = database.SessionLocal()
+    posts.record_post_change(writer_a, first, deleted=True)
+    writer_a.flush()
+
+    # Writer B tries to append and commit while A is still in flight.
+    def write_b():
+        writer_b = database.SessionLocal()
+        try:
+            posts.record_post_change(writer_b, second, deleted=True)
+            writer_b.commit()
+        finally:
+            writer_b.close()
+
+    thread_b = threading.Thread(target=write_b)
+    thread_b.start()
+    time.sleep(0.5)
+
+    # A client syncing now must not be handed a token past A's change.
+    token, seen = sync_all(start)
+
+    writer_a.commit()
+    writer_a.close()
+    thread_b.join(timeout=10)
+    assert not thread_b.is_alive()
+
+    token, more = sync_all(token)
+    seen += more
+    assert first.id in seen
+    assert second.id in seen
+    assert seen.index(first.id) < seen.index(second.id)
@@ -0,0 +1,71 @@
+# backend/tests/test_ratelimit.py
+import asyncio
+
+import pytest
+from fastapi.testclient import TestClient
+
+import main, ratelimit
+
+BUDGET = ratelimit.Budget(rate=2, burst=4)
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(ratelimit.time, "monotonic", clock)
+    return clock
+
+def take(backend, *charges):
+    return asyncio.run(backend.take(list(charges)))
+
+def test_bucket_rejects_when_empty_and_refills(clock):
+    backend = ratelimit.MemoryBackend()
+    for _ in range(4):
+        assert take(backend, ("k", BUDGET, 1)) == [0.0]
+    # Empty: one token arrives every 1 / rate seconds.
+    assert take(backend, ("k", BUDGET, 1)) == [0.5]
+
+    clock.now += 0.5
+    assert take(backend, ("k", BUDGET, 1)) == [0.0]
+    assert take(backend, ("k", BUDGET, 1)) == [0.5]
+
+    # Refill is capped at the burst size.
+    clock.now += 60
+    assert take(backend, ("k", BUDGET, 4)) == [0.0]
+    assert take(backend, ("k", BUDGET, 1)) == [0.5]
+
+def test_rejected_charges_spend_nothing(clock):
+    backend = ratelimit.MemoryBackend()
+    assert take(backend, ("small", BUDGET, 1), ("big", BUDGET, 5)) == [0.0, 0.5]
+    # The bucket that had room was not drained by the rejected request.
+    assert take(backend, ("small", BUDGET, 4)) == [0.0]
+    assert take(backend, ("big", BUDGET, 4)) == [0.0]
+
+@pytest.fixture
+def limiter(monkeypatch):
+    limiter = ratelimit.RateLimiter(ratelimit.MemoryBackend())
+    monkeypatch.setattr(ratelimit, "limiter", limiter)
+    return limiter
+
+def test_login_is_limited_per_account(limiter):
+    client = TestClient(main.app)
+    for _ in range(int(ratelimit.BUDGETS["login_account"].burst)):
+        response = client.post("/login", json={"email": "target@example.com", "password": "guess"})
+        assert response.status_code == 401  # The body still reaches the route after the peek
+
+    # The account is out of attempts, whatever the case of the email.
+    response = client.post("/login", json={"email": "Target@Example.com", "password": "guess"})
+    assert response.status_code == 429
+    assert int(response.headers["Retry-After"]) > 0
+
+    # Other accounts from the same IP are unaffected.
+    response = client.post("/login", json={"email": "someone@example.com", "password": "guess"})
+    assert response.status_code == 401
+    assert limiter.throttled["login_account"] == 1
+    assert limiter.throttled["login"] == 0
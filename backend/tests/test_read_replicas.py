@@ -0,0 +1,120 @@
+# backend/tests/test_read_replicas.py
+import time
+import uuid
+from types import SimpleNamespace
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import create_engine
+
+import auth, database, models
+
+database.Base.metadata.create_all(bind=database.engine)
+
+@pytest.fixture(autouse=True)
+def fresh_tracker(monkeypatch):
+    monkeypatch.setattr(database, "write_tracker", database.MemoryWriteTracker())
+
+def make_replica(path):
+    """A second SQLite file standing in for a replica that has not caught up."""
+    state = database.EngineState(f"replica-{path.stem}", create_engine(f"sqlite:///{path}"))
+    database.Base.metadata.create_all(bind=state.engine)
+    return state
+
+def make_dead_replica(tmp_path):
+    state = database.EngineState("replica-dead", create_engine(f"sqlite:///{tmp_path / 'missing' / 'dead.sqlite'}"))
+    state.checked_at -= database.HEALTH_CHECK_INTERVAL_SECONDS  # Due for a probe
+    return state
+
+def fake_request(token=None):
+    headers = {"authorization": f"Bearer {token}"} if token else {}
+    return SimpleNamespace(headers=headers, client=SimpleNamespace(host="10.0.0.1"))
+
+def read_bind(request):
+    sessions = database.get_read_db(request)
+    db = next(sessions)
+    try:
+        return db.get_bind()
+    finally:
+        sessions.close()
+
+def create_user(request) -> models.User:
+    sessions = database.get_db(request)
+    db = next(sessions)
+    try:
+        user = models.User(name="Replica Test", email=f"{uuid.uuid4().hex}@example.com", password_hash="x")
+        db.add(user)
+        db.commit()
+        db.refresh(user)
+        db.expunge(user)
+        return user
+    finally:
+        sessions.close()
+
+def test_reads_use_replica_until_client_writes(monkeypatch, tmp_path):
+    replica = make_replica(tmp_path / "replica.sqlite")
+    monkeypatch.setattr(database, "replicas", [replica])
+    writer, other = fake_request("writer-token"), fake_request("other-token")
+
+    assert read_bind(writer) is replica.engine
+    create_user(writer)
+    # The writer reads its own write from the primary; other clients stay on the replica.
+    assert read_bind(writer) is database.engine
+    assert read_bind(other) is replica.engine
+
+    monkeypatch.setattr(database, "READ_YOUR_WRITES_SECONDS", 0)
+    assert read_bind(writer) is replica.engine
+
+def test_client_is_pinned_to_one_replica(monkeypatch, tmp_path):
+    replicas = [make_replica(tmp_path / f"replica{i}.sqlite") for i in range(3)]
+    monkeypatch.setattr(database, "replicas", replicas)
+    for i in range(10):
+        request = fake_request(f"token-{i}")
+        assert len({read_bind(request) for _ in range(5)}) == 1
+
+def test_dead_replica_falls_back(monkeypatch, tmp_path):
+    live, dead = make_replica(tmp_path / "live.sqlite"), make_dead_replica(tmp_path)
+    monkeypatch.setattr(database, "replicas", [dead])
+    assert read_bind(fake_request("some-token")) is database.engine
+    assert not dead.healthy
+
+    # With a healthy replica left, every client is served by it instead.
+    monkeypatch.setattr(database, "replicas", [dead, live])
+    for i in range(10):
+        assert read_bind(fake_request(f"token-{i}")) is live.engine
+
+def test_no_replicas_reads_primary_and_tracks_nothing(monkeypatch):
+    monkeypatch.setattr(database, "replicas", [])
+    request = fake_request("no-replica-token")
+    create_user(request)
+    assert read_bind(request) is database.engine
+    assert database.write_tracker.recent_writes == {}
+
+def test_read_auth_falls_back_to_primary_for_new_user(monkeypatch, tmp_path):
+    replica = make_replica(tmp_path / "replica.sqlite")
+    monkeypatch.setattr(database, "replicas", [replica])
+    # Created by another client, so this client's reads still go to the replica.
+    user = create_user(fake_request("admin-token"))
+    token = auth.create_access_token(data={"sub": str(user.id), "role": user.role})
+
+    sessions = database.get_read_db(fake_request(token))
+    db = next(sessions)
+    try:
+        assert db.get_bind() is replica.engine
+        found = auth.get_current_user_for_read(token=token, db=db)
+        assert found.id == user.id
+        assert found in db  # Attached to the route's read session
+    finally:
+        sessions.close()
+
+def test_read_auth_rejects_unknown_user(monkeypatch, tmp_path):
+    monkeypatch.setattr(database, "replicas", [make_replica(tmp_path / "replica.sqlite")])
+    token = auth.create_access_token(data={"sub": str(uuid.uuid4()), "role": "user"})
+    sessions = database.get_read_db(fake_request(token))
+    db = next(sessions)
+    try:
+        with pytest.raises(HTTPException) as error:
+            auth.get_current_user_for_read(token=token, db=db)
+        assert error.value.status_code == 401
+    finally:
+        sessions.close()
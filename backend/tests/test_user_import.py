@@ -0,0 +1,84 @@
+# backend/tests/test_user_import.py
+import io
+import json
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+import database, models, user_import
+
+database.Base.metadata.create_all(bind=database.engine)
+
+@pytest.fixture
+def db():
+    db = database.SessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+@pytest.fixture
+def domain():
+    return f"import-{uuid.uuid4().hex[:8]}.example.com"
+
+def run_import(db, data: bytes, file_format: str):
+    # Threads instead of the spawned process pool keep the test fast; the
+    # importer only needs map().
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        stream = io.TextIOWrapper(io.BytesIO(data), encoding="utf-8-sig", errors="surrogateescape", newline="")
+        return user_import.UserImporter(db, executor).run(user_import.read_rows(stream, file_format))
+
+def errors_by_row(report):
+    return {error.row: error for error in report.errors}
+
+def test_csv_bad_rows_are_reported_and_skipped(db, domain):
+    db.add(models.User(name="Existing", email=f"taken@{domain}", phone="1", password_hash="x"))
+    db.commit()
+
+    lines = [
+        "name,email,phone,password",
+        f"Good One,one@{domain},555,secret",               # row 1
+        "No Email,not-an-email,555,secret",                 # row 2
+        f"Again,one@{domain},555,secret",                   # row 3
+        f"Taken,taken@{domain},555,secret",                 # row 4
+        f'"{"x" * 200_000}",huge@{domain},555,secret',      # row 5
+        f"Good Two,two@{domain},555,secret",                # row 6
+    ]
+    data = "\n".join(lines).encode()
+    # row 7: a byte sequence that is not UTF-8
+    data += b"\nBad \xff Bytes,bytes@" + domain.encode() + b",555,secret\n"
+
+    report = run_import(db, data, "csv")
+
+    assert (report.total, report.created, report.failed) == (7, 2, 5)
+    errors = errors_by_row(report)
+    assert set(errors) == {2, 3, 4, 5, 7}
+    assert errors[2].error.startswith("email:")
+    assert errors[3].error == "Duplicate email in file"
+    assert errors[4].error == "Email already registered"
+    assert errors[5].error.startswith("Malformed CSV")
+    assert errors[7].error == "Invalid UTF-8 in row"
+
+    created = {user.email for user in db.query(models.User).filter(models.User.email.like(f"%@{domain}"))}
+    assert created == {f"taken@{domain}", f"one@{domain}", f"two@{domain}"}
+
+def test_ndjson_bad_rows_are_reported_and_skipped(db, domain):
+    data = b"\n".join([
+        json.dumps({"name": "Good", "email": f"good@{domain}", "phone": "1", "password": "pw"}).encode(),
+        b"{not json",
+        json.dumps({"name": "Missing Password", "email": f"nopw@{domain}", "phone": "1"}).encode(),
+        b"",
+        json.dumps(["not", "an", "object"]).encode(),
+        b'{"name": "\xff", "email": "x@' + domain.encode() + b'", "phone": "1", "password": "pw"}',
+    ])
+
+    report = run_import(db, data, "ndjson")
+
+    assert (report.total, report.created, report.failed) == (5, 1, 4)
+    errors = errors_by_row(report)
+    assert set(errors) == {2, 3, 5, 6}
+    assert errors[2].error.startswith("Invalid JSON")
+    assert errors[3].email == f"nopw@{domain}"
+    assert errors[3].error.startswith("password:")
+    assert errors[6].error == "Invalid UTF-8 in row"
@@ -0,0 +1,204 @@
+# backend/user_import.py
+"""
+Bulk user import from CSV or NDJSON.
+
+Rows are read and validated incrementally, passwords are hashed in parallel
+across a process pool (bcrypt is CPU bound) and users are inserted in
+batches. A bad row is reported and skipped; it never aborts the import.
+
+Usage from the command line:
+    python user_import.py users.csv
+    python user_import.py users.ndjson --format ndjson
+"""
+import argparse
+import csv
+import io
+import json
+import multiprocessing
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from typing import IO, Iterator, List, Tuple
+
+from pydantic import ValidationError
+from sqlalchemy import insert, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+import models, schemas, auth, database
+
+BATCH_SIZE = 500
+MAX_REPORTED_ERRORS = 1000
+HASH_WORKERS = os.cpu_count() or 1
+
+# The file is decoded with errors="surrogateescape", which turns each invalid
+# UTF-8 byte into a lone surrogate. Valid text never contains these.
+UNDECODABLE = re.compile("[\udc80-\udcff]")
+
+# --- Row Parsing ---
+
+def read_rows(stream: IO[str], file_format: str) -> Iterator[Tuple[int, dict]]:
+    """
+    Yields (row_number, raw_row) pairs without loading the whole file. A row
+    that cannot be decoded or parsed is yielded as an exception instead, so
+    the caller reports it and carries on.
+    """
+    if file_format == "csv":
+        yield from read_csv_rows(stream)
+        return
+
+    for row_number, line in enumerate(stream, start=1):
+        line = line.strip()
+        if not line:
+            continue
+        if UNDECODABLE.search(line):
+            yield row_number, ValueError("Invalid UTF-8 in row")
+            continue
+        try:
+            row = json.loads(line)
+        except json.JSONDecodeError as e:
+            row = ValueError(f"Invalid JSON: {e.msg}")
+        yield row_number, row
+
+def read_csv_rows(stream: IO[str]) -> Iterator[Tuple[int, dict]]:
+    reader = csv.DictReader(stream)
+    row_number = 0
+    while True:
+        try:
+            row = next(reader)
+        except StopIteration:
+            return
+        except csv.Error as e:
+            # The reader has consumed the bad line, so it can carry on with the next one.
+            row_number += 1
+            yield row_number, ValueError(f"Malformed CSV: {e}")
+            continue
+        row_number += 1
+        if UNDECODABLE.search(" ".join(str(value) for value in row.values())):
+            yield row_number, ValueError("Invalid UTF-8 in row")
+        else:
+            yield row_number, row
+
+def detect_format(filename: str | None) -> str:
+    if filename and filename.lower().endswith((".ndjson", ".jsonl")):
+        return "ndjson"
+    return "csv"
+
+# --- Import ---
+
+def insert_ignoring_conflicts(db: Session, rows: List[dict]) -> set:
+    """Inserts rows, skipping emails that already exist. Returns the inserted emails."""
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        statement = postgresql.insert(models.User)
+    elif dialect == "sqlite":
+        statement = sqlite.insert(models.User)
+    else:
+        # No portable ON CONFLICT; rely on the pre-check done by the caller.
+        db.execute(insert(models.User), rows)
+        db.commit()
+        return {row["email"] for row in rows}
+
+    statement = statement.on_conflict_do_nothing(index_elements=["email"]).returning(models.User.email)
+    inserted = {email for (email,) in db.execute(statement.values(rows))}
+    db.commit()
+    return inserted
+
+class UserImporter:
+    def __init__(self, db: Session, executor: ProcessPoolExecutor):
+        self.db = db
+        self.executor = executor
+        self.report = schemas.UserImportReport()
+
+    def add_error(self, row_number: int, email: str | None, error: str):
+        self.report.failed += 1
+        if len(self.report.errors) < MAX_REPORTED_ERRORS:
+            self.report.errors.append(schemas.UserImportError(row=row_number, email=email, error=error))
+
+    def run(self, rows: Iterator[Tuple[int, dict]]) -> schemas.UserImportReport:
+        batch: List[Tuple[int, schemas.UserCreate]] = []
+        seen_emails = set()
+        for row_number, raw in rows:
+            self.report.total += 1
+            if isinstance(raw, Exception):
+                self.add_error(row_number, None, str(raw))
+                continue
+            try:
+                user = schemas.UserCreate.model_validate(raw)
+            except ValidationError as e:
+                first = e.errors()[0]
+                field = ".".join(str(part) for part in first["loc"])
+                self.add_error(row_number, raw.get("email") if isinstance(raw, dict) else None, f"{field}: {first['msg']}")
+                continue
+            if user.email in seen_emails:
+                self.add_error(row_number, user.email, "Duplicate email in file")
+                continue
+            seen_emails.add(user.email)
+            batch.append((row_number, user))
+            if len(batch) >= BATCH_SIZE:
+                self.flush(batch)
+                batch = []
+        if batch:
+            self.flush(batch)
+        return self.report
+
+    def flush(self, batch: List[Tuple[int, schemas.UserCreate]]):
+        emails = [user.email for _, user in batch]
+        existing = set(self.db.scalars(select(models.User.email).where(models.User.email.in_(emails))))
+        pending = []
+        for row_number, user in batch:
+            if user.email in existing:
+                self.add_error(row_number, user.email, "Email already registered")
+            else:
+                pending.append((row_number, user))
+        if not pending:
+            return
+
+        # Hash only the rows that will actually be inserted.
+        chunksize = max(1, len(pending) // (HASH_WORKERS * 4))
+        hashes = self.executor.map(auth.get_password_hash, [user.password for _, user in pending], chunksize=chunksize)
+        rows = [
+            {"name": user.name, "email": user.email, "phone": user.phone, "password_hash": password_hash}
+            for (_, user), password_hash in zip(pending, hashes)
+        ]
+        inserted = insert_ignoring_conflicts(self.db, rows)
+        for row_number, user in pending:
+            if user.email in inserted:
+                self.report.created += 1
+            else:
+                # Lost a race with another writer between the pre-check and the insert.
+                self.add_error(row_number, user.email, "Email already registered")
+
+def import_users(db: Session, stream: IO[str], file_format: str) -> schemas.UserImportReport:
+    # "spawn" avoids forking a process that may be running server threads.
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=HASH_WORKERS, mp_context=context) as executor:
+        return UserImporter(db, executor).run(read_rows(stream, file_format))
+
+def import_users_from_binary(db: Session, binary_stream: IO[bytes], file_format: str) -> schemas.UserImportReport:
+    # utf-8-sig drops the BOM that spreadsheet exports often prepend.
+    stream = io.TextIOWrapper(binary_stream, encoding="utf-8-sig", errors="surrogateescape", newline="")
+    try:
+        return import_users(db, stream, file_format)
+    finally:
+        stream.detach()
+
+# --- CLI ---
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk import users from a CSV or NDJSON file.")
+    parser.add_argument("path")
+    parser.add_argument("--format", choices=["csv", "ndjson"], help="Defaults to the file extension")
+    args = parser.parse_args()
+
+    file_format = args.format or detect_format(args.path)
+    db = database.SessionLocal()
+    try:
+        with open(args.path, "rb") as f:
+            report = import_users_from_binary(db, f, file_format)
+    finally:
+        db.close()
+    print(report.model_dump_json(indent=2))
+
+if __name__ == "__main__":
+    main()
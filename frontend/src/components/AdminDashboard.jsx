@@ -7,12 +7,15 @@ import api from '../api';
 
 const AdminDashboard = () => {
     const [users, setUsers] = useState([]);
+    const [nextCursor, setNextCursor] = useState(null);
     const [error, setError] = useState('');
 
-    const fetchUsers = async () => {
+    // Without a cursor the list is reloaded from the first page; with one, the next page is appended.
+    const fetchUsers = async (cursor = null) => {
         try {
-            const response = await api.get('/admin/users');
-            setUsers(response.data);
+            const response = await api.get('/admin/users', { params: cursor ? { cursor } : {} });
+            setUsers(prev => cursor ? [...prev, ...response.data.items] : response.data.items);
+            setNextCursor(response.data.next_cursor);
         } catch (err) {
             setError('Failed to fetch users.');
             console.error(err);
@@ -79,6 +82,11 @@ const AdminDashboard = () => {
                     </TableBody>
                 </Table>
             </TableContainer>
+            {nextCursor && (
+                <Box sx={{ display: 'flex', justifyContent: 'center', mt: 2 }}>
+                    <Button variant="outlined" onClick={() => fetchUsers(nextCursor)}>Load More</Button>
+                </Box>
+            )}
         </Box>
     );
 };
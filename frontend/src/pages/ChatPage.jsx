@@ -56,6 +56,21 @@ const ChatPage = ({ user }) => {
         // Handles incoming messages.
         socket.onmessage = (event) => {
             const messageData = JSON.parse(event.data);
+            // Answers server heartbeats so the connection isn't evicted as idle.
+            if (messageData.type === 'ping') {
+                socket.send(JSON.stringify({ type: 'pong' }));
+                return;
+            }
+            // Presence updates are batched events, not chat messages.
+            if (messageData.type === 'presence') return;
+            // A rejected message (e.g. rate limited): drop its optimistic copy and tell the user.
+            if (messageData.type === 'error') {
+                if (messageData.client_id) {
+                    setMessages(prevMessages => prevMessages.filter(m => m.id !== messageData.client_id));
+                }
+                alert(`Message not sent: ${messageData.detail}`);
+                return;
+            }
             // Uses the ref to check against the currently active room.
             if (messageData.room_id === selectedRoomRef.current?.id) {
                 setMessages(prevMessages => [...prevMessages, messageData]);
@@ -73,15 +88,17 @@ const ChatPage = ({ user }) => {
     // Sends a message through the WebSocket and performs an optimistic update.
     const handleSendMessage = (content) => {
         if (ws.current && ws.current.readyState === WebSocket.OPEN && selectedRoom) {
+            const tempId = `temp-${Date.now()}`;
             const messagePayload = {
                 room_id: selectedRoom.id,
                 content: content,
+                client_id: tempId, // Echoed back if the server rejects the message
             };
             ws.current.send(JSON.stringify(messagePayload));
 
             // Optimistic UI update for a snappy user experience
             const tempMessage = {
-                id: `temp-${Date.now()}`,
+                id: tempId,
                 sender_id: user.id,
                 content: content,
                 created_at: new Date().toISOString(),
@@ -1,5 +1,5 @@
 // frontend/src/pages/MyPosts.jsx
-import React, { useState, useEffect, useMemo } from 'react';
+import React, { useState, useEffect, useMemo, useRef } from 'react';
 import { Container, Grid, Typography, Button, Box, Select, MenuItem, FormControl, InputLabel, Stack, CircularProgress } from '@mui/material';
 import { Link as RouterLink } from 'react-router-dom';
 import api from '../api';
@@ -12,10 +12,14 @@ const MyPosts = () => {
     const [sortOrder, setSortOrder] = useState('newest');
     const [loading, setLoading] = useState(true);
 
+    const changeToken = useRef(null);
+
     const fetchMyPosts = async () => {
         setLoading(true);
         try {
+            // The list comes with the change token it is current as of, read from the same database.
             const response = await api.get('/posts/me');
+            changeToken.current = Number(response.headers['x-change-token']);
             setPosts(response.data);
         } catch (error) {
             console.error("Failed to fetch your posts:", error);
@@ -24,6 +28,26 @@ const MyPosts = () => {
         }
     };
 
+    // Applies only what changed since the last sync instead of reloading every post.
+    const syncMyPosts = async () => {
+        try {
+            let hasMore = true;
+            while (hasMore) {
+                const response = await api.get('/posts/me/changes', { params: { since: changeToken.current } });
+                const { upserted, removed, next_token, has_more } = response.data;
+                setPosts(prev => {
+                    const changedIds = new Set([...removed, ...upserted.map(p => p.id)]);
+                    return [...prev.filter(p => !changedIds.has(p.id)), ...upserted];
+                });
+                changeToken.current = next_token;
+                hasMore = has_more;
+            }
+        } catch (error) {
+            console.error("Failed to sync your posts:", error);
+            fetchMyPosts();
+        }
+    };
+
     useEffect(() => {
         fetchMyPosts();
     }, []);
@@ -31,7 +55,7 @@ const MyPosts = () => {
     const handleHideToggle = async (postId) => {
         try {
             await api.patch(`/posts/${postId}/toggle-visibility`);
-            fetchMyPosts();
+            syncMyPosts();
         } catch (error) {
             console.error("Failed to toggle post visibility", error);
             alert("Could not update post visibility. Please try again.");
@@ -42,7 +66,7 @@ const MyPosts = () => {
         if (window.confirm("Are you sure you want to permanently delete this post? This action cannot be undone.")) {
             try {
                 await api.delete(`/posts/${postId}`);
-                fetchMyPosts();
+                syncMyPosts();
             } catch (error) {
                 console.error("Failed to delete post", error);
                 alert("Could not delete post. Please try again.");